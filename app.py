@@ -1,30 +1,56 @@
-import ast
 import math
 import operator as op
-from dataclasses import dataclass
-from typing import Any, Dict
-
+import re
+from collections import deque
+from decimal import Decimal
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
 import streamlit as st
 
+try:
+    import numexpr as ne
+except ImportError:  # optional: vectorised safe_eval_many on large arrays
+    ne = None
+
+try:
+    import numba
+except ImportError:  # optional: JIT-compiled kernels for safe_eval_many when numexpr can't take the expression
+    numba = None
+
 
 # ----------------------------
 # Safe expression evaluator
 # ----------------------------
 
 ALLOWED_BINOPS = {
-    ast.Add: op.add,
-    ast.Sub: op.sub,
-    ast.Mult: op.mul,
-    ast.Div: op.truediv,
-    ast.FloorDiv: op.floordiv,
-    ast.Mod: op.mod,
-    ast.Pow: op.pow,
+    "+": op.add,
+    "-": op.sub,
+    "*": op.mul,
+    "/": op.truediv,
+    "//": op.floordiv,
+    "%": op.mod,
+    "**": op.pow,
 }
 
 ALLOWED_UNARYOPS = {
-    ast.UAdd: op.pos,
-    ast.USub: op.neg,
+    "+": op.pos,
+    "-": op.neg,
+}
+
+# Binding powers, following Python: unary signs bind looser than ** but tighter than * / // %
+BINOP_PRECEDENCE = {
+    "+": 10,
+    "-": 10,
+    "*": 20,
+    "/": 20,
+    "//": 20,
+    "%": 20,
+    "**": 40,
 }
+UNARY_PRECEDENCE = 30
 
 SAFE_NAMES: Dict[str, Any] = {
     "pi": math.pi,
@@ -50,73 +76,467 @@ SAFE_NAMES: Dict[str, Any] = {
     "ceil": math.ceil,
 }
 
+# Read-only split of SAFE_NAMES so name resolution needs no callable() check
+SAFE_CONSTS: Mapping[str, float] = MappingProxyType({k: v for k, v in SAFE_NAMES.items() if not callable(v)})
+SAFE_FUNCS: Mapping[str, Callable[..., Any]] = MappingProxyType({k: v for k, v in SAFE_NAMES.items() if callable(v)})
+
 
 class SafeEvalError(Exception):
     pass
 
 
-def safe_eval(expr: str) -> float:
+_TOKEN_RE = re.compile(
+    r"""
+    \s*(?:
+        (?P<NUMBER>(?:[0-9](?:_?[0-9])*(?:\.(?:[0-9](?:_?[0-9])*)?)?|\.[0-9](?:_?[0-9])*)(?:[eE][+-]?[0-9](?:_?[0-9])*)?)
+      | (?P<NAME>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<OP>\*\*|//|[-+*/%])
+      | (?P<LPAREN>\()
+      | (?P<RPAREN>\))
+      | (?P<COMMA>,)
+    )
+    """,
+    re.VERBOSE,
+)
+
+# Cheap pre-parse reject for characters the grammar can never accept
+_ALLOWED_RE = re.compile(r"[\s\d.+\-*/%(),^\w]*", re.ASCII)
+
+# RPN instruction kinds; a program is a tuple of (kind, payload) pairs
+CONST, BINOP, UNARYOP, CALL, VAR = range(5)
+
+Token = Tuple[str, str]
+Instruction = Tuple[int, Any]
+
+
+def _tokenize(expr: str) -> List[Token]:
+    tokens: List[Token] = []
+    pos, end = 0, len(expr)
+    match = _TOKEN_RE.match
+    while pos < end:
+        m = match(expr, pos)
+        if m is None:
+            raise SafeEvalError("Invalid syntax.")
+        kind = m.lastgroup
+        tokens.append((kind, m[kind]))
+        pos = m.end()
+    return tokens
+
+
+def _expect(tokens: List[Token], pos: int, kind: str) -> int:
+    if pos >= len(tokens) or tokens[pos][0] != kind:
+        raise SafeEvalError("Invalid syntax.")
+    return pos + 1
+
+
+def _parse_call(tokens: List[Token], pos: int, out: List[Instruction]) -> int:
+    func_name = tokens[pos][1]
+    func = SAFE_FUNCS.get(func_name)
+    if func is None:
+        raise SafeEvalError(f"Function '{func_name}' is not allowed.")
+
+    pos += 2  # name + "("
+    argc = 0
+    if pos < len(tokens) and tokens[pos][0] == "RPAREN":
+        pos += 1
+    else:
+        while True:
+            pos = _parse_expr(tokens, pos, 0, out)
+            argc += 1
+            if pos < len(tokens) and tokens[pos][0] == "COMMA":
+                pos += 1
+                if pos < len(tokens) and tokens[pos][0] == "RPAREN":
+                    pos += 1  # trailing comma, as Python allows: log(8, 2,)
+                    break
+                continue
+            pos = _expect(tokens, pos, "RPAREN")
+            break
+
+    out.append((CALL, (func, argc)))
+    return pos
+
+
+def _parse_prefix(tokens: List[Token], pos: int, out: List[Instruction]) -> int:
+    if pos >= len(tokens):
+        raise SafeEvalError("Invalid syntax.")
+    kind, text = tokens[pos]
+
+    if kind == "NUMBER":
+        is_float = "." in text or "e" in text or "E" in text
+        if not is_float and text[0] == "0" and text.strip("0_"):
+            raise SafeEvalError("Invalid syntax.")  # leading zeros (007) are ambiguous, as in Python
+        out.append((CONST, float(text) if is_float else int(text)))
+        return pos + 1
+
+    if kind == "OP" and text in ALLOWED_UNARYOPS:
+        pos = _parse_expr(tokens, pos + 1, UNARY_PRECEDENCE, out)
+        out.append((UNARYOP, ALLOWED_UNARYOPS[text]))
+        return pos
+
+    if kind == "LPAREN":
+        pos = _parse_expr(tokens, pos + 1, 0, out)
+        return _expect(tokens, pos, "RPAREN")
+
+    if kind == "NAME":
+        if pos + 1 < len(tokens) and tokens[pos + 1][0] == "LPAREN":
+            return _parse_call(tokens, pos, out)
+        value = SAFE_CONSTS.get(text)
+        if value is not None:
+            out.append((CONST, value))
+            return pos + 1
+        # Checked against the caller's variables in _compile
+        out.append((VAR, text))
+        return pos + 1
+
+    raise SafeEvalError("Invalid syntax.")
+
+
+def _parse_expr(tokens: List[Token], pos: int, min_prec: int, out: List[Instruction]) -> int:
+    # Pratt parser: operands/operators are emitted straight into `out` in RPN order
+    pos = _parse_prefix(tokens, pos, out)
+    while pos < len(tokens) and tokens[pos][0] == "OP":
+        symbol = tokens[pos][1]
+        prec = BINOP_PRECEDENCE[symbol]
+        if prec <= min_prec:
+            break
+        # ** is right-associative and its right operand may carry a sign (2 ** -1)
+        right_prec = UNARY_PRECEDENCE if symbol == "**" else prec
+        pos = _parse_expr(tokens, pos + 1, right_prec, out)
+        out.append((BINOP, ALLOWED_BINOPS[symbol]))
+    return pos
+
+
+def _to_rpn(tokens: List[Token]) -> Tuple[Instruction, ...]:
+    out: List[Instruction] = []
+    try:
+        pos = _parse_expr(tokens, 0, 0, out)
+    except RecursionError as e:
+        raise SafeEvalError("Expression is nested too deeply.") from e
+    if pos != len(tokens):
+        raise SafeEvalError("Invalid syntax.")
+    return tuple(out)
+
+
+def _do_const(stack: List[Any], value: Any) -> None:
+    stack.append(value)
+
+
+def _do_binop(stack: List[Any], func: Any) -> None:
+    right = stack.pop()
+    stack[-1] = func(stack[-1], right)
+
+
+def _do_unaryop(stack: List[Any], func: Any) -> None:
+    stack[-1] = func(stack[-1])
+
+
+def _do_call(stack: List[Any], arg: Tuple[Any, int]) -> None:
+    func, argc = arg
+    if argc:
+        args = stack[-argc:]
+        del stack[-argc:]
+        stack.append(func(*args))
+    else:
+        stack.append(func())
+
+
+# One table lookup per instruction instead of an if/elif cascade over kinds
+HANDLERS = {
+    CONST: _do_const,
+    BINOP: _do_binop,
+    UNARYOP: _do_unaryop,
+    CALL: _do_call,
+}
+
+
+def _run(program: Tuple[Instruction, ...]) -> Any:
+    stack: List[Any] = []
+    for kind, arg in program:
+        try:
+            handler = HANDLERS[kind]
+        except KeyError:
+            raise SafeEvalError("Unsupported expression.") from None
+        handler(stack, arg)
+    return stack[0]
+
+
+def _fold(program: Tuple[Instruction, ...]) -> Tuple[Instruction, ...]:
+    # Each stack entry holds the instructions that produce one operand
+    stack: List[List[Instruction]] = []
+    for ins in program:
+        kind, arg = ins
+        if kind == CONST or kind == VAR:
+            stack.append([ins])
+            continue
+
+        if kind == BINOP:
+            argc, func = 2, arg
+        elif kind == UNARYOP:
+            argc, func = 1, arg
+        else:
+            func, argc = arg
+        operands = stack[len(stack) - argc:]
+        del stack[len(stack) - argc:]
+
+        values = []
+        for operand in operands:
+            if len(operand) != 1 or operand[0][0] != CONST:
+                break
+            values.append(operand[0][1])
+        else:
+            try:
+                stack.append([(CONST, func(*values))])
+                continue
+            except Exception:
+                pass  # leave it unfolded so the error is raised at evaluation time
+
+        code = [i for operand in operands for i in operand]
+        code.append(ins)
+        stack.append(code)
+
+    return tuple(i for operand in stack for i in operand)
+
+
+COMPILE_CACHE_SIZE = 256
+
+
+# app.py is Streamlit's main script and is re-executed on every rerun, so a module-level cache would start
+# empty each time. The dict is fetched once per rerun through st.cache_resource; lookups stay plain dict gets.
+@st.cache_resource(show_spinner=False)
+def _compile_cache() -> Dict[Tuple[str, Tuple[str, ...]], Tuple[Instruction, ...]]:
+    return {}
+
+
+_COMPILE_CACHE = _compile_cache()
+
+
+def _compile(expr: str, variables: Tuple[str, ...] = ()) -> Tuple[Instruction, ...]:
+    # Keyed on the raw user string so repeated evaluations skip normalisation + parsing
+    key = (expr, variables)
+    program = _COMPILE_CACHE.get(key)
+    if program is None:
+        program = _compile_uncached(expr, variables)
+        if len(_COMPILE_CACHE) >= COMPILE_CACHE_SIZE:
+            _COMPILE_CACHE.clear()  # crude but atomic bound; entries are cheap to rebuild
+        _COMPILE_CACHE[key] = program
+    return program
+
+
+def _compile_uncached(expr: str, variables: Tuple[str, ...]) -> Tuple[Instruction, ...]:
     expr = expr.strip()
     if not expr:
         raise SafeEvalError("Empty expression.")
 
-    expr = expr.replace("^", "**")
+    # Mid-typing input is often garbage; reject it before tokenizing/parsing
+    if _ALLOWED_RE.fullmatch(expr) is None:
+        raise SafeEvalError("Invalid characters in expression.")
+    if expr.count("(") != expr.count(")"):
+        raise SafeEvalError("Unbalanced parentheses.")
+
+    if "^" in expr:
+        expr = expr.replace("^", "**")
+    program = _to_rpn(_tokenize(expr))
+    for kind, arg in program:
+        if kind == VAR and arg not in variables:
+            raise SafeEvalError(f"Name '{arg}' is not allowed.")
+    return _fold(program)
+
+
+def safe_eval(expr: str) -> Union[int, float]:
+    # Plain numbers (the common mid-typing case on the keypad) skip the parser entirely
+    text = expr.strip()
+    digits = text[1:] if text[:1] in ("+", "-") else text
+    if digits.replace(".", "", 1).isdigit() and digits.isascii():
+        if "." in digits:
+            return float(text)
+        if digits[0] != "0" or not digits.strip("0"):
+            return int(text)
+
+    # Returned as-is (int stays int) and left to the UI to format
+    result = _run(_compile(expr))
+    if not isinstance(result, (int, float)):
+        raise SafeEvalError("Result is not a real number.")
+    return result
+
+
+# Below this many elements numexpr's compile + thread start-up costs more than it saves
+MIN_VECTOR_SIZE = 256
+
+# Operators + function calls a program needs before a JIT kernel beats numba's dispatch overhead
+JIT_MIN_OPS = 5
+
+# Functions numexpr evaluates natively, by numexpr name (single-argument forms only)
+NUMEXPR_FUNCS = {
+    abs: "abs",
+    math.sqrt: "sqrt",
+    math.exp: "exp",
+    math.log: "log",
+    math.log10: "log10",
+    math.sin: "sin",
+    math.cos: "cos",
+    math.tan: "tan",
+    math.asin: "arcsin",
+    math.acos: "arccos",
+    math.atan: "arctan",
+}
+NUMEXPR_BINOPS = {func: symbol for symbol, func in ALLOWED_BINOPS.items() if symbol != "//"}
+
+# Functions numba can compile in nopython mode, by source name (single-argument forms only)
+NUMBA_FUNCS = {
+    abs: "abs",
+    math.sqrt: "math.sqrt",
+    math.exp: "math.exp",
+    math.log: "math.log",
+    math.log10: "math.log10",
+    math.sin: "math.sin",
+    math.cos: "math.cos",
+    math.tan: "math.tan",
+    math.asin: "math.asin",
+    math.acos: "math.acos",
+    math.atan: "math.atan",
+    math.degrees: "math.degrees",
+    math.radians: "math.radians",
+    math.floor: "math.floor",
+    math.ceil: "math.ceil",
+}
+NUMBA_BINOPS = {func: symbol for symbol, func in ALLOWED_BINOPS.items()}
+
+UNARYOP_SYMBOLS = {func: symbol for symbol, func in ALLOWED_UNARYOPS.items()}
+
+
+def _to_source(
+    program: Tuple[Instruction, ...],
+    binops: Mapping[Any, str],
+    funcs: Mapping[Any, str],
+    names: Mapping[str, str],
+) -> Optional[str]:
+    # Render a validated program back to infix source, or None if the target can't express it
+    stack: List[str] = []
+    for kind, arg in program:
+        if kind == CONST:
+            in_range = -(2**63) <= arg < 2**63 if isinstance(arg, int) else math.isfinite(arg)
+            if not in_range:
+                return None
+            stack.append(f"({arg!r})")  # folded constants may be negative: (-2)**x, not -2**x
+        elif kind == VAR:
+            stack.append(names[arg])
+        elif kind == BINOP:
+            symbol = binops.get(arg)
+            if symbol is None:
+                return None
+            right = stack.pop()
+            stack[-1] = f"({stack[-1]} {symbol} {right})"
+        elif kind == UNARYOP:
+            stack[-1] = f"({UNARYOP_SYMBOLS[arg]}{stack[-1]})"
+        else:
+            func, argc = arg
+            name = funcs.get(func)
+            if name is None or argc != 1:
+                return None
+            stack[-1] = f"{name}({stack[-1]})"
+    return stack[0]
+
+
+def _bind(program: Tuple[Instruction, ...], env: Mapping[str, Any]) -> Tuple[Instruction, ...]:
+    return tuple((CONST, env[arg]) if kind == VAR else (kind, arg) for kind, arg in program)
+
+
+def _build_kernel(source: str, arity: int) -> Callable[..., None]:
+    # `source` comes from _to_source over a validated program: numbers, operators,
+    # whitelisted math functions and v<k>[i] only
+    params = ", ".join(f"v{k}" for k in range(arity))
+    code = f"def kernel(out, {params}):\n    for i in range(out.shape[0]):\n        out[i] = {source}\n"
+    namespace: Dict[str, Any] = {"math": math}
+    exec(code, namespace)
+    # An explicit signature compiles eagerly, i.e. here on the worker thread rather than on first call
+    signature = f"void({', '.join(['float64[::1]'] * (arity + 1))})"
+    # No fastmath: it lets LLVM assume no nan/inf, and domain errors here surface as nan for the caller to reject
+    return numba.njit(signature)(namespace["kernel"])
+
+
+@st.cache_resource(show_spinner=False)
+def _jit_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="calc-jit")
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _jit_kernel(expr: str, names: Tuple[str, ...]) -> Optional[Future]:
+    program = _compile(expr, names)
+    if sum(kind != CONST and kind != VAR for kind, _ in program) < JIT_MIN_OPS:
+        return None
+    source = _to_source(program, NUMBA_BINOPS, NUMBA_FUNCS, {name: f"v{k}[i]" for k, name in enumerate(names)})
+    if source is None:
+        return None
+    return _jit_pool().submit(_build_kernel, source, len(names))
+
+
+def _eval_many(
+    expr: str,
+    program: Tuple[Instruction, ...],
+    names: Tuple[str, ...],
+    arrays: List[np.ndarray],
+    shape: Tuple[int, ...],
+) -> np.ndarray:
+    if ne is not None and math.prod(shape) >= MIN_VECTOR_SIZE:
+        # v<k> aliases: numexpr resolves its own function names (where, fmod, ...) ahead of local_dict
+        source = _to_source(program, NUMEXPR_BINOPS, NUMEXPR_FUNCS, {name: f"v{k}" for k, name in enumerate(names)})
+        if source is not None:
+            # float64 like the other paths; int arrays would otherwise get wrapping int64 arithmetic
+            local_dict = {f"v{k}": a.astype(np.float64, copy=False) for k, a in enumerate(arrays)}
+            # A program that folded to a constant evaluates to a 0-d array of the literal's dtype
+            return np.broadcast_to(ne.evaluate(source, local_dict=local_dict), shape).astype(np.float64)
+
+    if numba is not None and names:
+        kernel = _jit_kernel(expr, names)
+        # Never block on the compile: the scalar path below serves requests until the kernel is ready
+        if kernel is not None and kernel.done() and kernel.exception() is None:
+            out = np.empty(math.prod(shape))
+            kernel.result()(out, *(np.ascontiguousarray(a.ravel(), dtype=np.float64) for a in arrays))
+            return out.reshape(shape)
+
+    columns = [a.ravel().tolist() for a in arrays]
+    if columns:
+        results = [_run(_bind(program, dict(zip(names, row)))) for row in zip(*columns)]
+    else:
+        results = [_run(program)]
+    try:
+        return np.array(results, dtype=float).reshape(shape)
+    except TypeError as e:
+        raise SafeEvalError("Result is not a real number.") from e
+
+
+def safe_eval_many(expr: str, variables: Mapping[str, Any]) -> np.ndarray:
+    # Evaluate `expr` element-wise over broadcast variable arrays, e.g. to recompute history for new x.
+    # Whichever path runs, a domain error, non-finite element or bad function argument raises
+    # SafeEvalError: numexpr/numba yield nan/inf where the scalar path raises, so both are normalised here.
+    names = tuple(variables)
+    for name in names:
+        # The parser resolves built-in names first, so a colliding variable would be silently ignored
+        if name in SAFE_CONSTS or name in SAFE_FUNCS:
+            raise SafeEvalError(f"Variable name '{name}' is reserved.")
+    program = _compile(expr, names)
+    arrays = np.broadcast_arrays(*(np.asarray(variables[name]) for name in names)) if names else []
+    shape = arrays[0].shape if arrays else ()
 
     try:
-        node = ast.parse(expr, mode="eval")
-    except SyntaxError as e:
-        raise SafeEvalError("Invalid syntax.") from e
-
-    def _eval(n: ast.AST) -> Any:
-        if isinstance(n, ast.Expression):
-            return _eval(n.body)
-
-        if isinstance(n, ast.Constant):
-            if isinstance(n.value, (int, float)):
-                return n.value
-            raise SafeEvalError("Only numeric constants are allowed.")
-
-        if isinstance(n, ast.BinOp):
-            if type(n.op) not in ALLOWED_BINOPS:
-                raise SafeEvalError("Operator not allowed.")
-            return ALLOWED_BINOPS[type(n.op)](_eval(n.left), _eval(n.right))
-
-        if isinstance(n, ast.UnaryOp):
-            if type(n.op) not in ALLOWED_UNARYOPS:
-                raise SafeEvalError("Unary operator not allowed.")
-            return ALLOWED_UNARYOPS[type(n.op)](_eval(n.operand))
-
-        if isinstance(n, ast.Call):
-            if not isinstance(n.func, ast.Name):
-                raise SafeEvalError("Only simple function calls are allowed.")
-            func_name = n.func.id
-            func = SAFE_NAMES.get(func_name)
-            if func is None or not callable(func):
-                raise SafeEvalError(f"Function '{func_name}' is not allowed.")
-            args = [_eval(a) for a in n.args]
-            kwargs = {kw.arg: _eval(kw.value) for kw in n.keywords if kw.arg is not None}
-            return func(*args, **kwargs)
-
-        if isinstance(n, ast.Name):
-            if n.id in SAFE_NAMES and not callable(SAFE_NAMES[n.id]):
-                return SAFE_NAMES[n.id]
-            raise SafeEvalError(f"Name '{n.id}' is not allowed.")
-
-        raise SafeEvalError("Unsupported expression.")
-
-    result = _eval(node)
-    return float(result)
+        result = _eval_many(expr, program, names, arrays, shape)
+    except (ArithmeticError, ValueError) as e:
+        raise SafeEvalError("Result is undefined for some inputs.") from e
+    except TypeError as e:  # e.g. factorial() of a float array element, or a wrong argument count
+        raise SafeEvalError(str(e)) from e
+    if not np.isfinite(result).all():
+        raise SafeEvalError("Result is undefined for some inputs.")
+    return result
 
 
 # ----------------------------
 # UI definitions
 # ----------------------------
 
-@dataclass
-class CalcButton:
+class CalcButton(NamedTuple):
     label: str
     value: str
-    help: str = ""
+    help: Optional[str] = None
 
 
 BUTTON_ROWS = [
@@ -145,7 +565,7 @@ def init_state() -> None:
     st.session_state.setdefault("expr_input", "")
     st.session_state.setdefault("result", None)
     st.session_state.setdefault("error", None)
-    st.session_state.setdefault("history", [])  # list of (expr, shown)
+    st.session_state.setdefault("history", deque(maxlen=15))  # newest-first (expr, shown)
 
 
 def sync_from_input() -> None:
@@ -169,6 +589,16 @@ def clear_all() -> None:
     st.session_state.error = None
 
 
+def format_result(val: Union[int, float]) -> str:
+    if isinstance(val, float):
+        return str(int(val)) if val.is_integer() else str(val)
+    try:
+        return str(val)
+    except ValueError:
+        # Past Python's int -> str digit limit (4300 digits); show it in scientific notation instead
+        return format(Decimal(val).normalize(), ".16g")
+
+
 def evaluate() -> None:
     expr = (st.session_state.expr_input or "").strip()
     if not expr:
@@ -178,11 +608,10 @@ def evaluate() -> None:
 
     try:
         val = safe_eval(expr)
-        shown = str(int(val)) if val.is_integer() else str(val)
+        shown = format_result(val)
         st.session_state.result = shown
         st.session_state.error = None
-        st.session_state.history.insert(0, (expr, shown))
-        st.session_state.history = st.session_state.history[:15]
+        st.session_state.history.appendleft((expr, shown))
     except Exception as e:
         st.session_state.result = None
         st.session_state.error = str(e)
@@ -194,7 +623,22 @@ def use_history(expr: str) -> None:
 
 
 def clear_history() -> None:
-    st.session_state.history = []
+    st.session_state.history.clear()
+
+
+# Keypad values with a dedicated callback; everything else is appended as a token
+CALLBACKS = {
+    "BACK": backspace,
+    "CLEAR": clear_all,
+    "EVAL": evaluate,
+}
+
+# (callback, args) per keypad value, bound once at import rather than on every rerun
+BUTTON_CALLBACKS = {
+    btn.value: (CALLBACKS[btn.value], ()) if btn.value in CALLBACKS else (append_token, (btn.value,))
+    for row in BUTTON_ROWS
+    for btn in row
+}
 
 
 # ----------------------------
@@ -234,16 +678,10 @@ for i, f in enumerate(FUNC_CHIPS):
 st.subheader("Keypad")
 for row in BUTTON_ROWS:
     cols = st.columns(len(row))
-    for c, btn in zip(cols, row):
+    for c, (label, value, help_text) in zip(cols, row):
         with c:
-            if btn.value == "BACK":
-                st.button(btn.label, use_container_width=True, help=btn.help or None, on_click=backspace)
-            elif btn.value == "CLEAR":
-                st.button(btn.label, use_container_width=True, help=btn.help or None, on_click=clear_all)
-            elif btn.value == "EVAL":
-                st.button(btn.label, use_container_width=True, help=btn.help or None, on_click=evaluate)
-            else:
-                st.button(btn.label, use_container_width=True, help=btn.help or None, on_click=append_token, args=(btn.value,))
+            callback, args = BUTTON_CALLBACKS[value]
+            st.button(label, use_container_width=True, help=help_text, on_click=callback, args=args)
 
 with st.expander("History", expanded=False):
     if not st.session_state.history:
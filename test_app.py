@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+import app
+from app import SafeEvalError, safe_eval, safe_eval_many
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("-2**2", -4),
+    ("2**3**2", 512),
+    ("1-2-3", -4),
+    ("2**-1", 0.5),
+    ("8/2/2", 2),
+    ("-2^2", -4),
+    ("2*-3", -6),
+    ("1_000", 1000),
+    ("log(8, 2,)", 3),
+])
+def test_precedence_and_associativity(expr, expected):
+    assert safe_eval(expr) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("expr", [
+    "2 3",
+    "()",
+    "log(,)",
+    "007",
+    "(" * 1000 + "1" + ")" * 1000,
+])
+def test_syntax_errors(expr):
+    with pytest.raises(SafeEvalError):
+        safe_eval(expr)
+
+
+@pytest.mark.parametrize("expr, shown", [
+    ("sqrt(16)", "4"),
+    ("10/4", "2.5"),
+    ("2**70", "1180591620717411303424"),
+    ("10**5000", "1e+5000"),
+    ("-10**5000", "-1e+5000"),
+    ("factorial(2000)", "3.316275092450633e+5735"),
+])
+def test_format_result(expr, shown):
+    assert app.format_result(safe_eval(expr)) == shown
+
+
+@pytest.fixture(params=["scalar", "numexpr", "numba"])
+def path(request, monkeypatch):
+    # Force one evaluation path of safe_eval_many so each can be checked against the same expectations
+    if request.param == "numexpr":
+        if app.ne is None:
+            pytest.skip("numexpr not installed")
+        monkeypatch.setattr(app, "numba", None)
+        monkeypatch.setattr(app, "MIN_VECTOR_SIZE", 0)
+    else:
+        if request.param == "numba" and app.numba is None:
+            pytest.skip("numba not installed")
+        monkeypatch.setattr(app, "ne", None)
+        if request.param == "scalar":
+            monkeypatch.setattr(app, "numba", None)
+    return request.param
+
+
+def _warm_up(path, expr):
+    # The kernel compiles in the background; wait for it so the numba path is the one exercised
+    if path == "numba":
+        kernel = app._jit_kernel(expr, ("x",))
+        assert kernel is not None
+        kernel.result()
+
+
+@pytest.mark.parametrize("expr", [
+    "x**40 + 2**x - x*x + x/3 - x",
+    "sin(x) * 2 + x^2 + pi - abs(x)",
+    "(-2)**x + x*2 - x + x",
+])
+def test_paths_agree_with_safe_eval(path, expr):
+    x = np.arange(-5, 300)
+    expected = np.array([safe_eval(expr.replace("x", f"({v})")) for v in x.tolist()], dtype=float)
+    _warm_up(path, expr)
+
+    result = safe_eval_many(expr, {"x": x})
+
+    assert result.dtype == np.float64
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+def test_constant_programs_broadcast_to_input_shape(path):
+    result = safe_eval_many("2+3", {"x": np.arange(300)})
+
+    assert result.dtype == np.float64
+    np.testing.assert_array_equal(result, np.full(300, 5.0))
+
+
+@pytest.mark.parametrize("expr, x", [
+    ("sqrt(x) + x*2 - x/3 + x**2", np.arange(-3, 3)),
+    ("1/x + x + x + x + x", np.arange(-3, 3)),
+    ("x**0.5 + x + x + x + x", np.arange(-3, 3)),
+])
+def test_paths_raise_on_undefined_results(path, expr, x):
+    _warm_up(path, expr)
+    with pytest.raises(SafeEvalError):
+        safe_eval_many(expr, {"x": x})
+
+
+def test_variables_may_use_numexpr_function_names(path):
+    x = np.arange(300)
+
+    result = safe_eval_many("where + fmod", {"where": x, "fmod": x})
+
+    np.testing.assert_array_equal(result, 2.0 * x)
+
+
+@pytest.mark.parametrize("expr", ["factorial(x)", "sqrt(x, x)"])
+def test_bad_function_arguments_raise_safe_eval_error(path, expr):
+    with pytest.raises(SafeEvalError):
+        safe_eval_many(expr, {"x": np.arange(300.0)})
+
+
+@pytest.mark.parametrize("name", ["pi", "sqrt"])
+def test_reserved_variable_names_are_rejected(name):
+    with pytest.raises(SafeEvalError, match="reserved"):
+        safe_eval_many(f"{name} + 1", {name: np.array([0.0])})